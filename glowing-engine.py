@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 
 import os
-import subprocess
+import re
 import sys
-import stat
+from collections import namedtuple
+from operator import itemgetter
 
 SCRIPT_DIR = os.path.expanduser("~/glowing-engine/script")
+# Stat scripts from a thread pool (for NFS/SSHFS-mounted script directories)
+PARALLEL_SCAN = os.environ.get('GLOWING_ENGINE_PARALLEL_SCAN') == '1'
 
 # ANSI color codes
 COLORS = {
@@ -23,78 +26,256 @@ COLORS = {
     'RESET': '\033[0m'
 }
 
+# Color codes bound to names for the print paths
+C_BAN = COLORS['BANNER']
+C_HDR = COLORS['HEADER']
+C_OPT = COLORS['OPTION']
+C_PROMPT = COLORS['PROMPT']
+C_ERR = COLORS['ERROR']
+C_WRN = COLORS['WARNING']
+C_SUCC = COLORS['SUCCESS']
+C_SCR = COLORS['SCRIPT']
+C_EXE = COLORS['EXECUTABLE']
+C_NEX = COLORS['NON_EXEC']
+C_RST = COLORS['RESET']
+
+# Static screen fragments, built once at import
+_BANNER_BLOCK = (
+    f"{C_BAN}{'=' * 60}{C_RST}\n"
+    f"{C_BAN}{'SCRIPT LAUNCHER'.center(60)}{C_RST}\n"
+    f"{C_BAN}{'=' * 60}{C_RST}\n"
+    f"{C_HDR}{'Universal Script Runner with Sudo Support'.center(60)}{C_RST}\n"
+    f"{C_HDR}{'-' * 60}{C_RST}\n"
+    "\n"
+)
+_MENU_HEADER = (
+    f"{C_HDR}Available Scripts:{C_RST}\n"
+    f"{C_HDR}{'-' * 60}{C_RST}\n"
+)
+_MENU_FOOTER = (
+    f"\n{C_OPT} 0. Exit (or 'q'/'e'){C_RST}\n"
+    f"{C_HDR}{'-' * 60}{C_RST}\n"
+    f"{C_WRN}* = Executable script{C_RST}\n"
+    f"{C_WRN}!N = Run script N and exit the launcher{C_RST}\n"
+)
+_BANNER_BYTES = _BANNER_BLOCK.encode('utf-8')
+_MENU_HEADER_BYTES = _MENU_HEADER.encode('utf-8')
+_MENU_FOOTER_BYTES = _MENU_FOOTER.encode('utf-8')
+
+# Shebang line at the start of a script
+_SHEBANG_RE = re.compile(rb'^#!\s*([^\n]+)')
+# SGR colour sequences, which take no columns on screen
+_SGR_RE = re.compile(rb'\x1b\[[0-9;]*m')
+
+# Interpreter fallback by file extension
+_EXT_INTERP = {
+    '.py': 'python3',
+    '.sh': 'bash',
+    '.pl': 'perl',
+    '.rb': 'ruby',
+    '.js': 'node'
+}
+
+# A launchable entry in SCRIPT_DIR
+Script = namedtuple('Script', 'name path executable')
+
+# Script listing cache, keyed on SCRIPT_DIR's mtime
+_scripts_cache = {'mtime': None, 'data': None}
+
+# inotify flags and the events that change the directory listing
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_IN_WATCH_MASK = (
+    0x004    # IN_ATTRIB (chmod +x)
+    | 0x040  # IN_MOVED_FROM
+    | 0x080  # IN_MOVED_TO
+    | 0x100  # IN_CREATE
+    | 0x200  # IN_DELETE
+    | 0x400  # IN_DELETE_SELF
+    | 0x800  # IN_MOVE_SELF
+)
+# The watch itself is gone (directory deleted/moved, or IN_IGNORED after removal)
+_IN_WATCH_GONE = 0x400 | 0x800 | 0x8000
+
+# inotify descriptor watching SCRIPT_DIR (None = not set up yet, -1 = unavailable)
+_watch_fd = None
+
+# Whether the terminal understands ANSI escapes (Windows enables VT in main)
+_ansi_enabled = os.name == 'posix'
+
+# Last banner+menu frame written to the terminal
+_last_render = None
+
+# Interpreter probe results, keyed on (path, mtime_ns)
+_interp_cache = {}
+
 def clear_screen():
     """Clear terminal screen based on OS"""
-    os.system('clear' if os.name == 'posix' else 'cls')
+    if _ansi_enabled or os.environ.get('ANSICON') is not None:
+        sys.stdout.write('\x1b[H\x1b[2J')
+        sys.stdout.flush()
+    else:
+        os.system('cls')
+
+def write_bytes(data):
+    """Write pre-encoded output straight to the stdout buffer"""
+    buffer = getattr(sys.stdout, 'buffer', None)
+    if buffer is None:
+        sys.stdout.write(data.decode('utf-8', 'replace'))
+        return
+    # Keep ordering with anything still queued in the text layer
+    sys.stdout.flush()
+    buffer.write(data)
+    buffer.flush()
 
 def print_banner():
     """Display professional program banner"""
-    print(f"{COLORS['BANNER']}{'=' * 60}{COLORS['RESET']}")
-    print(f"{COLORS['BANNER']}{'SCRIPT LAUNCHER'.center(60)}{COLORS['RESET']}")
-    print(f"{COLORS['BANNER']}{'=' * 60}{COLORS['RESET']}")
-    print(f"{COLORS['HEADER']}{'Universal Script Runner with Sudo Support'.center(60)}{COLORS['RESET']}")
-    print(f"{COLORS['HEADER']}{'-' * 60}{COLORS['RESET']}")
-    print()
+    write_bytes(_BANNER_BYTES)
+
+def watch_script_dir():
+    """Set up an inotify watch on SCRIPT_DIR once; return its fd or -1"""
+    global _watch_fd
+    if _watch_fd is not None:
+        return _watch_fd
+    _watch_fd = -1
+    if not sys.platform.startswith('linux'):
+        return _watch_fd
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            return _watch_fd
+        if libc.inotify_add_watch(fd, os.fsencode(SCRIPT_DIR), _IN_WATCH_MASK) < 0:
+            os.close(fd)
+            return _watch_fd
+        _watch_fd = fd
+    except (OSError, AttributeError):
+        pass
+    return _watch_fd
+
+def drain_watch_events(fd):
+    """Consume pending inotify events; return True if there were any"""
+    global _watch_fd
+    changed = False
+    while True:
+        try:
+            buf = os.read(fd, 4096)
+        except BlockingIOError:
+            return changed
+        if not buf:
+            return changed
+        changed = True
+        # struct inotify_event: wd, mask, cookie, len, then len bytes of name
+        pos = 0
+        while pos + 16 <= len(buf):
+            mask = int.from_bytes(buf[pos + 4:pos + 8], sys.byteorder)
+            if mask & _IN_WATCH_GONE:
+                # Drop the dead watch so the next listing sets up a new one
+                os.close(fd)
+                _watch_fd = None
+                return True
+            pos += 16 + int.from_bytes(buf[pos + 12:pos + 16], sys.byteorder)
+
+def script_from_entry(entry):
+    """Build a Script from a directory entry"""
+    # Check if file is executable (any x bit set)
+    st = entry.stat()
+    return Script(entry.name, entry.path, bool(st.st_mode & 0o111))
 
 def list_scripts():
     """List available scripts in the script directory"""
     try:
-        all_files = os.listdir(SCRIPT_DIR)
-        scripts = []
-        for f in all_files:
-            path = os.path.join(SCRIPT_DIR, f)
-            if os.path.isfile(path):
-                # Check if file is executable
-                executable = os.access(path, os.X_OK)
-                scripts.append({
-                    'name': f,
-                    'path': path,
-                    'executable': executable
-                })
-        return sorted(scripts, key=lambda x: x['name'])
+        watch_fd = watch_script_dir()
+        if watch_fd >= 0:
+            # Event-driven: rescan only when inotify reported a change
+            if not drain_watch_events(watch_fd) and _scripts_cache['data'] is not None:
+                return _scripts_cache['data']
+            if _watch_fd is None:
+                # Watch was dropped; re-arm it before the rescan so nothing slips between
+                watch_script_dir()
+            mtime = None
+        else:
+            # Only rescan when the directory itself has changed
+            mtime = os.stat(SCRIPT_DIR).st_mtime_ns
+            if _scripts_cache['mtime'] == mtime:
+                return _scripts_cache['data']
+
+        with os.scandir(SCRIPT_DIR) as it:
+            entries = [entry for entry in it if entry.is_file()]
+        if PARALLEL_SCAN and len(entries) > 16:
+            # Overlap the stat round-trips on network filesystems
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(32, len(entries))) as ex:
+                rows = list(ex.map(script_from_entry, entries))
+        else:
+            rows = [script_from_entry(entry) for entry in entries]
+        rows.sort(key=itemgetter(0))
+        # Parallel arrays keep the menu loop off per-entry objects
+        scripts = {
+            'names': [row.name for row in rows],
+            'paths': [row.path for row in rows],
+            'exec': bytearray(row.executable for row in rows)
+        }
+        _scripts_cache['mtime'] = mtime
+        _scripts_cache['data'] = scripts
+        return scripts
     except FileNotFoundError:
-        print(f"\n{COLORS['ERROR']}ERROR: Script directory not found: {SCRIPT_DIR}{COLORS['RESET']}")
-        print(f"{COLORS['WARNING']}Please create the directory or update the path in the script.{COLORS['RESET']}")
+        print(f"\n{C_ERR}ERROR: Script directory not found: {SCRIPT_DIR}{C_RST}")
+        print(f"{C_WRN}Please create the directory or update the path in the script.{C_RST}")
         sys.exit(1)
     except PermissionError:
-        print(f"\n{COLORS['ERROR']}ERROR: Permission denied accessing script directory{COLORS['RESET']}")
+        print(f"\n{C_ERR}ERROR: Permission denied accessing script directory{C_RST}")
         sys.exit(1)
 
 def get_interpreter(script_path):
     """Determine the appropriate interpreter for a script"""
     try:
-        with open(script_path, 'r') as f:
-            first_line = f.readline().strip()
-            if first_line.startswith('#!'):
-                return first_line[2:].strip()
+        key = (script_path, os.stat(script_path).st_mtime_ns)
+    except OSError:
+        key = None
+    if key in _interp_cache:
+        return _interp_cache[key]
+    interpreter = _probe_interpreter(script_path)
+    if key is not None:
+        _interp_cache[key] = interpreter
+    return interpreter
+
+def _probe_interpreter(script_path):
+    """Read the shebang or fall back to the file extension"""
+    try:
+        # A single raw read is enough to see the shebang line
+        fd = os.open(script_path, os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0))
+        try:
+            buf = os.read(fd, 128)
+        finally:
+            os.close(fd)
+        m = _SHEBANG_RE.match(buf)
+        if m:
+            return m.group(1).rstrip().decode('utf-8', 'replace')
     except Exception:
         pass
     
     # Check file extension
-    if script_path.endswith('.py'):
-        return 'python3'
-    elif script_path.endswith('.sh'):
-        return 'bash'
-    elif script_path.endswith('.pl'):
-        return 'perl'
-    elif script_path.endswith('.rb'):
-        return 'ruby'
-    elif script_path.endswith('.js'):
-        return 'node'
-    return None
-
-def run_script(script_info, use_sudo=False):
-    """Execute selected script with optional sudo"""
-    script_path = script_info['path']
-    script_name = script_info['name']
+    return _EXT_INTERP.get(os.path.splitext(script_path)[1])
+
+def run_script(scripts, idx, use_sudo=False, replace=False):
+    """Execute selected script with optional sudo, or exec into it if replace"""
+    # Only needed once a script is launched; keeps menu start-up lean
+    import shutil
+    import subprocess
+
+    script_path = scripts['paths'][idx]
+    script_name = scripts['names'][idx]
     
-    print(f"\n{COLORS['SCRIPT']}Running {script_name} {'with SUDO' if use_sudo else ''}...{COLORS['RESET']}")
-    print(f"{COLORS['SCRIPT']}{'-' * 60}{COLORS['RESET']}")
+    print(f"\n{C_SCR}Running {script_name} {'with SUDO' if use_sudo else ''}...{C_RST}")
+    print(f"{C_SCR}{'-' * 60}{C_RST}")
     
     try:
         if use_sudo:
             command = ['sudo', script_path]
-        elif script_info['executable']:
+        elif scripts['exec'][idx]:
             command = [script_path]
         else:
             # Try to determine interpreter from shebang or extension
@@ -102,81 +283,173 @@ def run_script(script_info, use_sudo=False):
             if interpreter:
                 command = [interpreter, script_path]
             else:
-                print(f"{COLORS['WARNING']}WARNING: No interpreter found, trying to execute directly{COLORS['RESET']}")
+                print(f"{C_WRN}WARNING: No interpreter found, trying to execute directly{C_RST}")
                 command = [script_path]
         
-        result = subprocess.run(command)
-        print(f"{COLORS['SCRIPT']}{'-' * 60}{COLORS['RESET']}")
+        if replace:
+            # Hand the process over to the script; nothing returns from here
+            sys.stdout.flush()
+            os.execvp(command[0], command)
+
+        # Resolving the executable to a full path and leaving fds alone
+        # (ours are non-inheritable anyway) lets CPython use posix_spawn
+        # instead of fork+exec
+        executable = shutil.which(command[0]) or command[0]
+        result = subprocess.run(command, executable=executable, close_fds=False)
+        print(f"{C_SCR}{'-' * 60}{C_RST}")
         
         if result.returncode == 0:
-            print(f"{COLORS['SUCCESS']}Script completed successfully!{COLORS['RESET']}")
+            print(f"{C_SUCC}Script completed successfully!{C_RST}")
         else:
-            print(f"{COLORS['WARNING']}Script completed with exit code: {result.returncode}{COLORS['RESET']}")
+            print(f"{C_WRN}Script completed with exit code: {result.returncode}{C_RST}")
     except subprocess.CalledProcessError as e:
-        print(f"\n{COLORS['ERROR']}Warning: Script exited with error (code {e.returncode}){COLORS['RESET']}")
+        print(f"\n{C_ERR}Warning: Script exited with error (code {e.returncode}){C_RST}")
     except FileNotFoundError:
-        print(f"\n{COLORS['ERROR']}ERROR: Command not found. Ensure the interpreter is installed.{COLORS['RESET']}")
+        print(f"\n{C_ERR}ERROR: Command not found. Ensure the interpreter is installed.{C_RST}")
     except Exception as e:
-        print(f"\n{COLORS['ERROR']}Unexpected error: {str(e)}{COLORS['RESET']}")
+        print(f"\n{C_ERR}Unexpected error: {str(e)}{C_RST}")
+
+def exit_launcher():
+    """Say goodbye and leave the launcher"""
+    print(f"\n{C_SUCC}Exiting...{C_RST}")
+    sys.exit(0)
+
+def ask(prompt):
+    """Read a line of input, stripped and lower-cased; Ctrl-C/EOF exits"""
+    try:
+        return input(prompt).strip().lower()
+    except (KeyboardInterrupt, EOFError):
+        exit_launcher()
+
+def getch():
+    """Read a single keypress without waiting for Enter"""
+    if sys.platform == 'win32':
+        import msvcrt
+        return msvcrt.getwch()
+    import termios
+    import tty
+    fd = sys.stdin.fileno()
+    old = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        return sys.stdin.read(1)
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old)
+
+def read_choice(prompt, single_key):
+    """Read a menu choice, as a single keypress when single_key is set"""
+    if not single_key:
+        return ask(prompt)
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    try:
+        choice = getch()
+        if choice == '!':
+            # Exec-replace prefix needs the digit that follows it
+            sys.stdout.write(choice)
+            sys.stdout.flush()
+            choice += getch()
+    except KeyboardInterrupt:
+        exit_launcher()
+    # Echo the keypress since the terminal no longer does
+    print(choice[-1])
+    return choice
 
 def print_menu(scripts):
     """Display script menu with execution indicators"""
-    print(f"{COLORS['HEADER']}Available Scripts:{COLORS['RESET']}")
-    print(f"{COLORS['HEADER']}{'-' * 60}{COLORS['RESET']}")
-    
-    for idx, script in enumerate(scripts, 1):
-        color = COLORS['EXECUTABLE'] if script['executable'] else COLORS['NON_EXEC']
-        exe_indicator = '*' if script['executable'] else ''
-        print(f"{COLORS['OPTION']}{idx:>2}. {script['name']}{exe_indicator}{COLORS['RESET']}")
-    
-    print(f"\n{COLORS['OPTION']} 0. Exit (or 'q'/'e'){COLORS['RESET']}")
-    print(f"{COLORS['HEADER']}{'-' * 60}{COLORS['RESET']}")
-    print(f"{COLORS['WARNING']}* = Executable script{COLORS['RESET']}")
+    write_bytes(format_menu(scripts))
+
+def format_menu(scripts):
+    """Render the script menu as encoded bytes"""
+    parts = []
+    append = parts.append
+    opt = C_OPT
+    reset = C_RST
+    exec_mask = scripts['exec']
+    for idx, name in enumerate(scripts['names'], 1):
+        exe_indicator = '*' if exec_mask[idx - 1] else ''
+        append(f"{opt}{idx:>2}. {name}{exe_indicator}{reset}\n")
+    # Only the per-script lines are encoded per render
+    body = ''.join(parts).encode('utf-8', 'surrogateescape')
+    return _MENU_HEADER_BYTES + body + _MENU_FOOTER_BYTES
+
+def frame_width(frame):
+    """Widest visible line of a frame, so wrapped lines can be detected"""
+    return max(len(_SGR_RE.sub(b'', line).decode('utf-8', 'replace'))
+               for line in frame.split(b'\n'))
+
+def draw_screen(frame):
+    """Paint banner+menu, skipping the repaint if it is already on screen"""
+    global _last_render
+    lines = frame.count(b'\n')
+    try:
+        cols, rows = os.get_terminal_size()
+    except OSError:
+        cols, rows = 0, 0
+    # Prompt and error lines must fit below the menu without scrolling it
+    if (frame == _last_render and _ansi_enabled and lines + 4 < rows
+            and frame_width(frame) <= cols):
+        # Home, step over the unchanged menu and wipe the old prompt
+        sys.stdout.write(f'\x1b[H\x1b[{lines}B\x1b[J')
+        sys.stdout.flush()
+    else:
+        clear_screen()
+        write_bytes(frame)
+    _last_render = frame
 
 def main():
     """Main program loop"""
+    global _ansi_enabled, _last_render
     # Enable ANSI colors on Windows
     if sys.platform == 'win32':
-        os.system('color')
+        _ansi_enabled = os.system('color') == 0
     
     while True:
-        clear_screen()
-        print_banner()
-
         scripts = list_scripts()
-        if not scripts:
-            print(f"{COLORS['WARNING']}WARNING: No scripts found in directory.{COLORS['RESET']}")
-            print(f"{COLORS['WARNING']}Add scripts to {SCRIPT_DIR} and restart the launcher.{COLORS['RESET']}")
+        count = len(scripts['names'])
+        if not count:
+            clear_screen()
+            print_banner()
+            print(f"{C_WRN}WARNING: No scripts found in directory.{C_RST}")
+            print(f"{C_WRN}Add scripts to {SCRIPT_DIR} and restart the launcher.{C_RST}")
             sys.exit(1)
 
-        print_menu(scripts)
+        draw_screen(_BANNER_BYTES + format_menu(scripts))
 
-        try:
-            choice = input(f"\n{COLORS['PROMPT']}Select a script to run (0-{len(scripts)} or 'q'/'e' to exit): {COLORS['RESET']}")
-            
-            # Exit options
-            if choice.lower() in ['0', 'q', 'e']:
-                print(f"\n{COLORS['SUCCESS']}Exiting...{COLORS['RESET']}")
-                break
-            
-            choice = int(choice)
-            if 1 <= choice <= len(scripts):
-                script = scripts[choice - 1]
-                
-                # Ask if sudo is needed
-                use_sudo = False
-                if os.name == 'posix' and os.geteuid() != 0:
-                    sudo_choice = input(f"{COLORS['PROMPT']}Run with sudo? [y/N]: {COLORS['RESET']}").lower()
-                    use_sudo = sudo_choice in ['y', 'yes']
-                
-                run_script(script, use_sudo)
-                input(f"\n{COLORS['PROMPT']}Press Enter to return to menu...{COLORS['RESET']}")
-            else:
-                print(f"{COLORS['ERROR']}Invalid selection: {choice}. Choose 0-{len(scripts)}{COLORS['RESET']}")
-                input(f"{COLORS['PROMPT']}Press Enter to try again...{COLORS['RESET']}")
-        except ValueError:
-            print(f"{COLORS['ERROR']}Please enter a valid number{COLORS['RESET']}")
-            input(f"{COLORS['PROMPT']}Press Enter to try again...{COLORS['RESET']}")
+        # Menus that fit in one digit are driven by single keypresses
+        single_key = count < 10 and sys.stdin.isatty()
+        choice = read_choice(f"\n{C_PROMPT}Select a script to run (0-{count} or 'q'/'e' to exit): {C_RST}", single_key).strip().lower()
+        
+        # Exit options
+        if choice in ('0', 'q', 'e'):
+            exit_launcher()
+        
+        # A leading '!' replaces the launcher with the script
+        replace = choice.startswith('!')
+        if replace:
+            choice = choice[1:]
+
+        # Reject non-numeric input up front instead of via int() raising
+        if not choice.isdecimal():
+            print(f"{C_ERR}Please enter a valid number{C_RST}")
+            ask(f"{C_PROMPT}Press Enter to try again...{C_RST}")
+            continue
+
+        choice = int(choice)
+        if not 1 <= choice <= count:
+            print(f"{C_ERR}Invalid selection: {choice}. Choose 0-{count}{C_RST}")
+            ask(f"{C_PROMPT}Press Enter to try again...{C_RST}")
+            continue
+
+        # Ask if sudo is needed
+        use_sudo = False
+        if os.name == 'posix' and os.geteuid() != 0:
+            use_sudo = ask(f"{C_PROMPT}Run with sudo? [y/N]: {C_RST}") in ('y', 'yes')
+        
+        run_script(scripts, choice - 1, use_sudo, replace)
+        # Script output has scrolled the menu away
+        _last_render = None
+        ask(f"\n{C_PROMPT}Press Enter to return to menu...{C_RST}")
 
 if __name__ == "__main__":
     main()
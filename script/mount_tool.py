@@ -14,14 +14,19 @@ Features:
 """
 
 from __future__ import annotations
-import os, sys, json, subprocess, termios, tty, time, re, shutil
+import os, sys, subprocess, termios, tty, time, re, shutil, signal, select
 from pathlib import Path
+from operator import itemgetter
 from dataclasses import dataclass, field
 from typing import List, Optional, Any
 
 # -------------------- Config --------------------
 DEFAULT_MOUNT_BASE = "/mnt"
 VMKEYS_DIR = Path("/etc/vmkeys")
+# external tools, resolved to absolute paths once at startup
+REQUIRED_TOOLS = ("lsblk", "mount", "umount")
+BINS = {name: shutil.which(name) for name in REQUIRED_TOOLS + (
+    "swapon", "swapoff", "cryptsetup", "kill", "sudo", "xdg-open", "gnome-terminal")}
 _USE_COLORS = sys.stdout.isatty()
 COL = {
     "reset": "\033[0m" if _USE_COLORS else "",
@@ -35,6 +40,9 @@ COL = {
     "magenta": "\033[35m" if _USE_COLORS else "",
     "blue": "\033[34m" if _USE_COLORS else "",
 }
+# color codes bound once for the redraw/print paths
+_RST, _BOLD, _UL, _REV, _GRN, _YEL, _RED, _CYN, _MAG, _BLU = (COL[k] for k in (
+    "reset", "bold", "underline", "rev", "green", "yellow", "red", "cyan", "magenta", "blue"))
 
 BANNER = r"""
 ███╗   ███╗ ██████╗ ██╗   ██╗███╗   ██╗████████╗
@@ -44,9 +52,12 @@ BANNER = r"""
 ██║ ╚═╝ ██║╚██████╔╝╚██████╔╝██║ ╚████║   ██║
 ╚═╝     ╚═╝ ╚═════╝  ╚═════╝ ╚═╝  ╚═══╝   ╚═╝
 """
+TITLE = "Storage Browser • q=quit r=reload arrows/jk=move Enter=refresh"
+# colored banner + title, built once and prepended to every full frame
+_BANNER_TEXT = _MAG+BANNER+_RST+"\n"+_BOLD+TITLE+_RST+"\n"
 
 # -------------------- Data --------------------
-@dataclass
+@dataclass(slots=True)
 class Partition:
     name: str
     size: str
@@ -59,10 +70,15 @@ class Partition:
     is_luks: bool = False
     luks_mapper: Optional[str] = None
     luks_unlocked: bool = False
+    # kernel name (dm-3 for an LV whose name is vg0-home); empty means same as name
+    kname: str = ""
+    # device paths, computed once instead of per access
+    dev: str = field(init=False, repr=False)
+    mapper_path: str = field(init=False, repr=False)
 
-    @property
-    def dev(self) -> str:
-        return f"/dev/{self.name}"
+    def __post_init__(self):
+        self.dev = f"/dev/{self.kname or self.name}"
+        self.mapper_path = f"/dev/mapper/{self.luks_mapper}" if self.luks_mapper else ""
 
     @property
     def mount(self) -> str:
@@ -70,214 +86,464 @@ class Partition:
         return mps[0] if mps else "-"
 
 # -------------------- Utilities --------------------
-def run_cmd(cmd: List[str], check=True, capture=True, text=True, env=None):
-    try:
-        return subprocess.run(cmd, check=check, capture_output=capture, text=text, env=env)
-    except subprocess.CalledProcessError as e:
-        return e
+def resolve(cmd: List[str]) -> List[str]:
+    return [BINS.get(cmd[0]) or cmd[0]] + cmd[1:]
+
+def run_cmd_silent(cmd: List[str]) -> int:
+    # output is discarded, so no pipes and no decoding
+    return subprocess.run(resolve(cmd), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode
+
+def spawn(cmd: List[str]) -> int:
+    # posix_spawnp + waitpid, for commands whose output we don't capture
+    pid = os.posix_spawnp(cmd[0], cmd, os.environ)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+# decided once; empty when already root
+_PRIV_PREFIX = [] if os.geteuid() == 0 else [BINS["sudo"] or "sudo"]
 
 def run_priv(cmd: List[str]):
-    if os.geteuid() == 0:
-        return run_cmd(cmd)
-    return run_cmd(["sudo"] + cmd)
+    argv = _PRIV_PREFIX + resolve(cmd)
+    rc = spawn(argv)
+    if rc != 0: raise subprocess.CalledProcessError(rc, argv)
+    return rc
+
+# home + clear screen + clear scrollback, like clear(1), without the fork
+_CLEAR = "\x1b[H\x1b[2J\x1b[3J"
 
 def clear_screen():
-    if sys.stdout.isatty(): os.system("clear")
+    if sys.stdout.isatty(): sys.stdout.write(_CLEAR); sys.stdout.flush()
+
+# (fd, saved attrs) while main() holds the terminal in cbreak mode
+_TTY = None
+_HIDE_CURSOR, _SHOW_CURSOR = "\x1b[?25l", "\x1b[?25h"
 
 def safe_input(prompt=""):
+    # line input needs echo and canonical mode back for the duration of the prompt
+    if _TTY: termios.tcsetattr(_TTY[0],termios.TCSADRAIN,_TTY[1]); sys.stdout.write(_SHOW_CURSOR)
     try:
         return input(prompt)
     except (KeyboardInterrupt, EOFError):
         return None
+    finally:
+        if _TTY: tty.setcbreak(_TTY[0]); sys.stdout.write(_HIDE_CURSOR); sys.stdout.flush()
 
 def confirm(prompt: str, default_no=True) -> bool:
     suffix = " [y/N]: " if default_no else " [Y/n]: "
-    ans = safe_input(COL["yellow"] + prompt + suffix + COL["reset"])
+    ans = safe_input(_YEL + prompt + suffix + _RST)
     if ans is None: return False
     ans = ans.strip().lower()
     if not ans: return not default_no
     return ans in ("y", "yes")
 
+# mountpoint -> (timestamp, usage); navigation redraws reuse these
+_DF_CACHE: dict[str, tuple[float, str]] = {}
+_DF_TTL = 2.0
+
 def df_usage(mountpoint: str) -> str:
     if not mountpoint or mountpoint == "-":
         return "-"
+    now = time.monotonic()
+    hit = _DF_CACHE.get(mountpoint)
+    if hit and now - hit[0] < _DF_TTL:
+        return hit[1]
     try:
-        out = run_cmd(["df", "-h", mountpoint]).stdout.strip().splitlines()
-        if len(out) >= 2:
-            parts = out[1].split()
-            return parts[4] if len(parts) >= 5 else "ERR"
-    except Exception:
-        return "ERR"
-    return "ERR"
+        # same figure df prints: used / (used + available to users), rounded up
+        st = os.statvfs(mountpoint)
+        used = st.f_blocks - st.f_bfree
+        total = used + st.f_bavail
+        usage = f"{-(-used * 100 // total)}%" if total else "-"
+    except OSError:
+        usage = "ERR"
+    _DF_CACHE[mountpoint] = (now, usage)
+    return usage
+
+# every value df_usage can produce, coloured once at import
+_USAGE_STRINGS = {f"{v}%": (_GRN if v < 70 else _YEL if v < 90 else _RED)+f"{v}%"+_RST for v in range(101)}
+_USAGE_STRINGS["ERR"] = _RED+"ERR"+_RST
 
 def color_usage(usage: str) -> str:
-    if usage.endswith("%"):
-        try:
-            v = int(usage.rstrip("%"))
-            if v < 70: return f"{COL['green']}{usage}{COL['reset']}"
-            if v < 90: return f"{COL['yellow']}{usage}{COL['reset']}"
-            return f"{COL['red']}{usage}{COL['reset']}"
-        except Exception:
-            pass
-    if usage == "ERR": return f"{COL['red']}ERR{COL['reset']}"
-    return usage
+    return _USAGE_STRINGS.get(usage, usage)
+
+def active_swaps() -> set:
+    # kernel's own list of swap areas in use, canonicalised (mappers appear as /dev/dm-N)
+    try:
+        with open("/proc/swaps") as f:
+            next(f, None)
+            return {os.path.realpath(line.split(None, 1)[0]) for line in f if line.strip()}
+    except OSError:
+        return set()
 
 # -------------------- LSBLK Parsing --------------------
-def fetch_devices() -> List[Partition]:
+# one KEY="value" pair of `lsblk -P` output; unsafe characters arrive as \xHH
+_LSBLK_KV = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+_LSBLK_ESC = re.compile(r'\\x([0-9a-fA-F]{2})')
+_LSBLK_FIELDS = itemgetter("NAME", "SIZE", "TYPE", "FSTYPE", "LABEL", "UUID", "MOUNTPOINT", "PKNAME", "KNAME")
+
+def unescape(v: str) -> str:
+    return _LSBLK_ESC.sub(lambda m: chr(int(m.group(1), 16)), v) if "\\x" in v else v
+
+# -------------------- sysfs Scan --------------------
+# the rows lsblk -P would print, read from sysfs, udev's database and mountinfo
+_SYS_BLOCK = "/sys/class/block"
+_UDEV_DATA = "/run/udev/data"
+_DM_TYPES = (("CRYPT-", "crypt"), ("LVM-", "lvm"), ("mpath-", "mpath"), ("part", "part"))
+_MOUNT_ESC = re.compile(r'\\([0-7]{3})')
+_DIGITS = re.compile(r'(\d+)')
+
+def natural_key(name: str):
+    return [int(t) if t.isdigit() else t for t in _DIGITS.split(name)]
+
+def human_size(n: int) -> str:
+    # lsblk's style: 1024-based, at most one decimal, one-letter suffix
+    size = float(n)
+    for unit in "BKMGTPE":
+        if size < 1024 or unit == "E": break
+        size /= 1024
+    return f"{size:.1f}".rstrip("0").rstrip(".")+unit
+
+def read_sys(path: str) -> str:
+    with open(path) as f: return f.read().strip()
+
+def mount_table() -> dict:
+    # first mountpoint per maj:min and per source device path
+    mounts = {}
+    with open("/proc/self/mountinfo") as f:
+        for line in f:
+            left, _, right = line.partition(" - ")
+            fields = left.split()
+            mp = _MOUNT_ESC.sub(lambda m: chr(int(m.group(1), 8)), fields[4])
+            mounts.setdefault(fields[2], mp)
+            src = right.split()[1:2]
+            if src and src[0].startswith("/dev/"): mounts.setdefault(os.path.realpath(src[0]), mp)
+    return mounts
+
+def udev_fs(devno: str) -> dict:
+    props = {}
+    try:
+        with open(f"{_UDEV_DATA}/b{devno}") as f:
+            for line in f:
+                if line.startswith("E:ID_FS_"):
+                    k, _, v = line[2:].rstrip("\n").partition("=")
+                    props[k] = v
+    except OSError:
+        pass
+    return props
+
+def sysfs_rows(swaps: set):
+    # None without udev's database (containers, no udevd): only lsblk can probe then
+    if not os.path.isdir(_UDEV_DATA): return None
+    mounts = mount_table()
+    nodes, parent = {}, {}
+    with os.scandir(_SYS_BLOCK) as it:
+        for e in it:
+            base, kname = e.path, e.name
+            sectors = int(read_sys(f"{base}/size"))
+            if not sectors: continue  # empty loop/floppy slots, hidden by lsblk too
+            name, typ = kname, "disk"
+            if os.path.exists(f"{base}/partition"):
+                typ = "part"
+                parent[kname] = os.path.basename(os.path.dirname(os.path.realpath(base)))
+            elif os.path.isdir(f"{base}/dm"):
+                name = read_sys(f"{base}/dm/name")
+                dm_uuid = read_sys(f"{base}/dm/uuid")
+                typ = next((t for prefix, t in _DM_TYPES if dm_uuid.startswith(prefix)), "dm")
+                slaves = sorted(os.listdir(f"{base}/slaves"))
+                if slaves: parent[kname] = slaves[0]
+            elif os.path.exists(f"{base}/md/level"): typ = read_sys(f"{base}/md/level")
+            elif kname.startswith("loop"): typ = "loop"
+            elif kname.startswith("sr"): typ = "rom"
+            devno = read_sys(f"{base}/dev")
+            fs = udev_fs(devno)
+            dev = f"/dev/{kname}"
+            mp = "[SWAP]" if dev in swaps else mounts.get(devno) or mounts.get(dev, "")
+            nodes[kname] = [name, human_size(sectors*512), typ, fs.get("ID_FS_TYPE", ""),
+                            fs.get("ID_FS_LABEL_ENC", ""), fs.get("ID_FS_UUID", ""), mp]
+    children = {}
+    for kname, pk in parent.items():
+        if pk in nodes: children.setdefault(pk, []).append(kname)
+    # depth-first like lsblk: each disk, then its partitions, then what sits on them
+    stack = sorted((k for k in nodes if parent.get(k) not in nodes), key=natural_key, reverse=True)
+    rows = []
+    while stack:
+        kname = stack.pop()
+        pk = parent.get(kname)
+        rows.append(tuple(nodes[kname])+(pk if pk in nodes else "", kname))
+        stack.extend(sorted(children.get(kname, ()), key=natural_key, reverse=True))
+    return rows
+
+def lsblk_rows():
     try:
-        out = run_cmd(["lsblk", "-J", "-o", "NAME,SIZE,TYPE,FSTYPE,LABEL,UUID,MOUNTPOINTS"]).stdout
-        raw = json.loads(out).get("blockdevices", [])
+        with subprocess.Popen(resolve(["lsblk", "-P", "-o", "NAME,SIZE,TYPE,FSTYPE,LABEL,UUID,MOUNTPOINT,PKNAME,KNAME"]),
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True) as proc:
+            return [_LSBLK_FIELDS(dict(_LSBLK_KV.findall(line))) for line in proc.stdout]
     except Exception:
-        return []
+        return None
+
+def fetch_devices() -> List[Partition]:
+    swaps = active_swaps()
+    try: rows = sysfs_rows(swaps)
+    except (OSError, ValueError): rows = None
+    if rows is None: rows = lsblk_rows()
+    if rows is None: return []
+    # an opened LUKS container has a crypt child pointing back at its KNAME via PKNAME
+    mapper_by_parent = {pk: name for name, _, typ, *_, pk, _ in rows if typ == "crypt"}
     parts = []
-    def walk(node):
-        name = node.get("name","")
-        size = node.get("size","")
-        typ = node.get("type","")
-        fs = node.get("fstype") or ""
-        label = node.get("label")
-        uuid = node.get("uuid")
-        mps = node.get("mountpoints") or []
+    for name, size, typ, fs, label, uuid, mp, _, kname in rows:
+        # whole disks are never listed; everything else (part, crypt, lvm, loop...) is
+        if not typ or typ=="disk": continue
         is_swap = (fs == "swap")
         is_luks = False
         mapper = None
         unlocked = False
         if typ == "crypt":
             is_luks = True; mapper = name; unlocked=True
-        elif fs == "crypto_LUKS": is_luks=True
-        if typ in ("part","crypt","lvm") or (typ and typ!="disk"):
-            parts.append(Partition(name=name,size=size,fstype=fs,mountpoints=mps,label=label,uuid=uuid,type=typ,is_swap=is_swap,is_luks=is_luks,luks_mapper=mapper,luks_unlocked=unlocked))
-        for ch in node.get("children") or []:
-            walk(ch)
-    for dev in raw: walk(dev)
+        elif fs == "crypto_LUKS":
+            is_luks=True
+            mapper = mapper_by_parent.get(kname); unlocked = mapper is not None
+        mps = [unescape(mp)] if mp else []
+        parts.append(Partition(name=name,size=size,fstype=fs,mountpoints=mps,label=unescape(label) or None,uuid=uuid or None,type=typ,is_swap=is_swap,is_luks=is_luks,luks_mapper=mapper,luks_unlocked=unlocked,kname=kname))
     return parts
 
 # -------------------- UI --------------------
-def pad(s:str,w:int)->str: return (s or "").ljust(w)[:w]
 def shorten(s:str,w:int)->str:
     if not s: return ""
     return s if len(s)<=w else s[:max(0,w-1)]+"…"
 
-def format_row(p:Partition, sel=False, mount_w=22)->str:
-    usage = color_usage(df_usage(p.mount))
-    fs = p.fstype or "-"
-    label = p.label or p.uuid or "-"
+# fixed-width columns; Use% is padded by hand since its colour codes have no width
+ROW_FMT = "{name:<14.14} {size:<8.8} {fs:<10.10} {lab:<20.20} {mp:<{mw}.{mw}} {st:<28.28} {use}"
+
+_NO_USAGE = "-".ljust(6)
+
+def usage_cells(devs:List[Partition]) -> dict:
+    # one df_usage per distinct real mountpoint ("[SWAP]" is not one), coloured and padded
+    cells = {}
+    for mp in {p.mount for p in devs if p.mount.startswith("/")}:
+        usage = df_usage(mp)
+        cells[mp] = color_usage(usage)+" "*(6-len(usage))
+    return cells
+
+def format_row(p:Partition, sel=False, mount_w=22, usages=None)->str:
     status=[]
     if p.is_swap: status.append("SWAP")
     if p.is_luks and p.luks_unlocked: status.append(f"LUKS:UNLOCKED({p.luks_mapper or '-'})")
     elif p.is_luks: status.append("LUKS:LOCKED")
-    cols=[pad(p.name,14),pad(p.size,8),pad(fs,10),pad(shorten(label,20),20),pad(shorten(p.mount,mount_w),mount_w),pad(shorten("/".join(status) if status else "-",28),28),pad(usage,6)]
-    line=" ".join(cols)
-    return (COL["rev"]+line+COL["reset"]) if sel else line
+    line=ROW_FMT.format(name=p.name,size=p.size,fs=p.fstype or "-",lab=shorten(p.label or p.uuid or "-",20),
+                        mp=shorten(p.mount,mount_w),mw=mount_w,st=shorten("/".join(status) if status else "-",28),
+                        use=(usages or {}).get(p.mount,_NO_USAGE))
+    return (_REV+line+_RST) if sel else line
 
-def draw_list(devs:List[Partition], selected:int):
-    clear_screen()
-    print(COL["magenta"]+BANNER+COL["reset"])
-    title="Storage Browser • q=quit r=reload arrows/jk=move Enter=refresh"
-    print(COL["bold"]+title+COL["reset"])
-    max_mount = max([len(p.mount) for p in devs]+[5])
-    mount_w = min(max_mount+2,30)
-    header=" ".join([pad("Device",14),pad("Size",8),pad("FSType",10),pad("Label/UUID",20),pad("Mount",mount_w),pad("Status",28),pad("Use%",6)])
-    print(COL["underline"]+header+COL["reset"])
-    for i,p in enumerate(devs):
-        print(format_row(p,i==selected,mount_w))
+# (devs, selected, rendered rows, usage cells) currently on screen; None forces a full frame
+_SCREEN = None
+# terminal line of the first device row: banner, blank line and header come first
+_ROW0 = _BANNER_TEXT.count("\n")+3
+_BANNER_W = max(len(l) for l in (BANNER+TITLE).splitlines())
+
+def layout(devs:List[Partition]):
+    # mount column width and header only change with the device list
+    mount_w = min(max([len(p.mount) for p in devs]+[5])+2,30)
+    header=ROW_FMT.format(name="Device",size="Size",fs="FSType",lab="Label/UUID",mp="Mount",mw=mount_w,st="Status",use="Use%  ")
+    return mount_w, header
+
+def draw_list(devs:List[Partition], selected:int, mount_w:int, header:str):
+    global _SCREEN
+    tty_out = sys.stdout.isatty()
+    try: cols, lines = os.get_terminal_size() if tty_out else (0, 0)
+    except OSError: cols, lines = 0, 0
+    end = _ROW0+len(devs)
+    # row positions only hold if nothing wraps; the plain header is exactly as wide as a row
+    if _SCREEN and _SCREEN[0] is devs and end <= lines and max(len(header),_BANNER_W) <= cols:
+        # same list already painted: only the old and new highlight rows change
+        _, old, rows, usages = _SCREEN
+        out=[]
+        if old != selected:
+            for i in (old, selected):
+                rows[i] = format_row(devs[i],i==selected,mount_w,usages)
+                out.append(f"\x1b[{_ROW0+i};1H\x1b[2K{rows[i]}")
+        out.append(f"\x1b[{end};1H\x1b[J")
+        sys.stdout.write("".join(out))
+        sys.stdout.flush()
+        _SCREEN = (devs, selected, rows, usages)
+        return
+    usages=usage_cells(devs)
+    rows=[format_row(p,i==selected,mount_w,usages) for i,p in enumerate(devs)]
+    # build the whole frame and emit it with a single write
+    buf=[_CLEAR+_BANNER_TEXT if tty_out else _BANNER_TEXT, _UL+header+_RST]
+    buf.extend(rows)
+    sys.stdout.write("\n".join(buf)+"\n")
+    sys.stdout.flush()
+    _SCREEN = (devs, selected, rows, usages) if tty_out else None
 
 # -------------------- Key Input --------------------
+def read_char() -> str:
+    # straight from the fd: Python's stdin buffer would hide queued keys from select
+    return os.read(sys.stdin.fileno(),1).decode("latin-1")
+
+def key_pending() -> bool:
+    return bool(select.select([sys.stdin.fileno()],[],[],0)[0])
+
 def get_key():
-    fd=sys.stdin.fileno()
-    old=termios.tcgetattr(fd)
-    try:
-        tty.setraw(fd)
-        ch=sys.stdin.read(1)
-        if ch=="\x1b":
-            seq1=sys.stdin.read(1)
-            if seq1=="[":
-                seq2=sys.stdin.read(1)
-                return {"A":"up","B":"down","C":"right","D":"left"}.get(seq2,"esc")
-            return "esc"
-        if ch.lower() in ("j","k","h","m","u","s","x","t","q","h"): return ch.lower()
-        if ch in "123456789": return ch
-        if ch=="\r": return "enter"
-        return ch
-    finally:
-        termios.tcsetattr(fd,termios.TCSADRAIN,old)
+    # the terminal is already in cbreak mode (see main), so just read
+    ch=read_char()
+    if ch=="\x1b":
+        seq1=read_char()
+        if seq1=="[":
+            seq2=read_char()
+            return {"A":"up","B":"down","C":"right","D":"left"}.get(seq2,"esc")
+        return "esc"
+    if ch.lower() in ("j","k","h","m","u","s","x","t","q","h"): return ch.lower()
+    if ch in "123456789": return ch
+    if ch in ("\r","\n"): return "enter"
+    return ch
 
 # -------------------- Filesystem Actions --------------------
 LAST_MOUNT_POINTS = {}
 
+# (mtime_ns, names) of VMKEYS_DIR, rescanned only when the directory changes
+_KEYS = (None, frozenset())
+
+def key_names() -> frozenset:
+    global _KEYS
+    try: mtime = VMKEYS_DIR.stat().st_mtime_ns
+    except OSError: return frozenset()
+    if _KEYS[0] != mtime:
+        with os.scandir(VMKEYS_DIR) as it:
+            _KEYS = (mtime, frozenset(e.name for e in it if e.is_file()))
+    return _KEYS[1]
+
+def find_keyfile(p:Partition) -> Optional[str]:
+    keys = key_names()
+    for cand in (f"{p.uuid}.key", f"{p.label}.key", f"{p.name}.key"):
+        if cand in keys: return str(VMKEYS_DIR/cand)
+    return None
+
 def choose_mount_point(p:Partition):
     default = LAST_MOUNT_POINTS.get(p.name,f"{DEFAULT_MOUNT_BASE}/{p.name}")
-    ans = safe_input(COL["cyan"]+f"Mount point [{default}]: "+COL["reset"])
+    ans = safe_input(_CYN+f"Mount point [{default}]: "+_RST)
     if not ans: ans=default
     Path(ans).mkdir(parents=True,exist_ok=True)
     LAST_MOUNT_POINTS[p.name]=ans
     return ans
 
+def pids_using(dev_path:str) -> List[int]:
+    # what fuser -m does: cwd, root, exe, open fds or mappings on the device's
+    # filesystem, or the device node itself held open
+    try: rdev = os.stat(dev_path).st_rdev
+    except OSError: return []
+    if not rdev: return []
+    maps_dev = f"{os.major(rdev):02x}:{os.minor(rdev):02x}"
+    me = os.getpid()
+    pids=[]
+    with os.scandir("/proc") as it:
+        for e in it:
+            if not e.name.isdigit() or int(e.name)==me: continue
+            base=f"/proc/{e.name}"
+            try:
+                links=[f"{base}/cwd",f"{base}/root",f"{base}/exe"]
+                with os.scandir(f"{base}/fd") as fds: links.extend(fd.path for fd in fds)
+                found=False
+                for link in links:
+                    try: st=os.stat(link)
+                    except OSError: continue
+                    if st.st_dev==rdev or st.st_rdev==rdev: found=True; break
+                if not found:
+                    with open(f"{base}/maps") as f:
+                        found=any(line.split(None,4)[3:4]==[maps_dev] for line in f)
+            except OSError:
+                continue  # process exited or is not ours to inspect
+            if found: pids.append(int(e.name))
+    return pids
+
 def kill_processes_using(dev_path:str):
-    if not shutil.which("lsof"): return True
-    try:
-        res=run_cmd(["lsof","-t",dev_path],capture=True)
-        pids=[x for x in res.stdout.strip().split() if x.isdigit()]
-    except: pids=[]
+    return kill_pids(dev_path,pids_using(dev_path))
+
+def kill_pids(dev_path:str, pids:List[int]):
     if not pids: return True
     if not confirm(f"Kill processes using {dev_path}?",True): return False
-    for pid in pids:
-        try: run_priv(["kill","-TERM",pid])
-        except: pass
+    errors=[]
+    if not _PRIV_PREFIX:
+        # signal directly instead of spawning kill(1) per pid
+        for pid in pids:
+            try: os.kill(pid,signal.SIGTERM)
+            except OSError as e: errors.append(f"{pid}: {e.strerror}")
+    else:
+        try: run_priv(["kill","-TERM"]+[str(pid) for pid in pids])
+        except Exception as e: errors.append(str(e))
+    if errors: print(_RED+"Failed to signal "+", ".join(errors)+_RST)
     time.sleep(0.5)
     return True
 
+def current_mount(dev_path:str, listed:str="-") -> str:
+    # kernel's view right now; the listed row can be stale, and an opened LUKS
+    # parent row shows no mountpoint even when its mapper is mounted
+    real=os.path.realpath(dev_path)
+    if not os.path.exists(real): return listed  # no node to match mountinfo against
+    if real in active_swaps(): return "[SWAP]"
+    return mount_table().get(real,"-")
+
 def do_mount(p:Partition):
-    if p.mount!="-": print(COL["yellow"]+f"Already mounted at {p.mount}"+COL["reset"]); return
+    dev_path = p.mapper_path or p.dev
+    cur = current_mount(dev_path,p.mount)
+    if cur!="-": print(_YEL+f"Already mounted at {cur}"+_RST); return
     mp = choose_mount_point(p)
-    dev_path = p.dev
-    if p.is_luks and p.luks_unlocked and p.luks_mapper:
-        dev_path=f"/dev/mapper/{p.luks_mapper}"
-    elif p.is_luks and not p.luks_unlocked:
+    if p.is_luks and not p.luks_unlocked:
         # try auto keyfile unlock
-        key_candidates=[VMKEYS_DIR/f"{p.uuid}.key",VMKEYS_DIR/f"{p.label}.key",VMKEYS_DIR/f"{p.name}.key"]
-        keyfile=None
-        for k in key_candidates:
-            if k.is_file(): keyfile=str(k); break
+        keyfile=find_keyfile(p)
         if keyfile:
             mapper=p.name
             try:
                 run_priv(["cryptsetup","open","--type","luks","--key-file",keyfile,p.dev,mapper])
-                p.luks_unlocked=True; p.luks_mapper=mapper
-                dev_path=f"/dev/mapper/{mapper}"
-                print(COL["green"]+f"Auto-unlocked LUKS {p.dev} -> /dev/mapper/{mapper}"+COL["reset"])
-            except: print(COL["red"]+f"Failed to unlock {p.dev}"+COL["reset"]); return
-        else: print(COL["red"]+f"LUKS device {p.dev} locked, no keyfile"+COL["reset"]); return
+                p.luks_unlocked=True; p.luks_mapper=mapper; p.mapper_path=f"/dev/mapper/{mapper}"
+                dev_path=p.mapper_path
+                print(_GRN+f"Auto-unlocked LUKS {p.dev} -> {dev_path}"+_RST)
+            except: print(_RED+f"Failed to unlock {p.dev}"+_RST); return
+        else: print(_RED+f"LUKS device {p.dev} locked, no keyfile"+_RST); return
     if not kill_processes_using(dev_path): return
     try:
         run_priv(["mount",dev_path,mp])
-        print(COL["green"]+f"[+] Mounted {dev_path} -> {mp}"+COL["reset"])
+        print(_GRN+f"[+] Mounted {dev_path} -> {mp}"+_RST)
     except Exception as e:
-        print(COL["red"]+f"Failed mount {dev_path}: {e}"+COL["reset"])
+        print(_RED+f"Failed mount {dev_path}: {e}"+_RST)
 
 def do_unmount(p:Partition):
-    if p.mount=="-": print(COL["yellow"]+f"Already unmounted {p.dev}"+COL["reset"]); return
-    if not kill_processes_using(p.dev): return
+    dev_path = p.mapper_path or p.dev
+    cur = current_mount(dev_path,p.mount)
+    if cur=="-": print(_YEL+f"Already unmounted {dev_path}"+_RST); return
+    if cur=="[SWAP]": print(_YEL+f"{dev_path} is active swap; use s to turn it off"+_RST); return
+    # only look for users if the plain umount fails
+    try:
+        run_priv(["umount",cur])
+        print(_GRN+f"[+] Unmounted {dev_path} from {cur}"+_RST)
+        return
+    except Exception as e:
+        pids=pids_using(dev_path)
+        if not pids: print(_RED+f"Failed unmount {dev_path}: {e}"+_RST); return
+    if not kill_pids(dev_path,pids): return
     try:
-        run_priv(["umount",p.mount])
-        print(COL["green"]+f"[+] Unmounted {p.dev} from {p.mount}"+COL["reset"])
+        run_priv(["umount",cur])
+        print(_GRN+f"[+] Unmounted {dev_path} from {cur}"+_RST)
     except Exception as e:
-        print(COL["red"]+f"Failed unmount {p.dev}: {e}"+COL["reset"])
+        print(_RED+f"Failed unmount {dev_path}: {e}"+_RST)
 
 def do_swap_toggle(p:Partition):
-    if not p.is_swap: print(COL["yellow"]+f"{p.dev} is not swap"+COL["reset"]); return
-    if "SWAP" in (p.mountpoints or []):
-        try: run_priv(["swapoff",p.dev]); print(COL["green"]+f"[+] Swap OFF {p.dev}"+COL["reset"])
-        except: print(COL["red"]+f"Failed swapoff {p.dev}"+COL["reset"])
+    dev_path = p.mapper_path or p.dev
+    if not p.is_swap: print(_YEL+f"{dev_path} is not swap"+_RST); return
+    # re-read /proc/swaps: the listed state may predate a swapon/swapoff run elsewhere
+    if os.path.realpath(dev_path) in active_swaps():
+        try: run_priv(["swapoff",dev_path]); print(_GRN+f"[+] Swap OFF {dev_path}"+_RST)
+        except: print(_RED+f"Failed swapoff {dev_path}"+_RST)
     else:
-        try: run_priv(["swapon",p.dev]); print(COL["green"]+f"[+] Swap ON {p.dev}"+COL["reset"])
-        except: print(COL["red"]+f"Failed swapon {p.dev}"+COL["reset"])
+        try: run_priv(["swapon",dev_path]); print(_GRN+f"[+] Swap ON {dev_path}"+_RST)
+        except: print(_RED+f"Failed swapon {dev_path}"+_RST)
+
+# keys that act on the selected partition and then need a device refresh
+ACTIONS = {"m": do_mount, "u": do_unmount, "s": do_swap_toggle}
 
 # -------------------- Help --------------------
 HELP_TEXT="""
 Arrow keys / j,k: Navigate
 Numbers 1-9: Jump to device
-Enter: Refresh
+Enter / r: Refresh
 m: Mount selected
 u: Unmount selected
 s: Toggle swap
@@ -288,42 +554,75 @@ q: Quit
 """
 
 def show_help():
+    global _SCREEN
+    _SCREEN = None
     clear_screen()
-    print(COL["cyan"]+"HELP:"+COL["reset"])
+    print(_CYN+"HELP:"+_RST)
     print(HELP_TEXT)
     safe_input("Press Enter to return...")
 
 # -------------------- Main --------------------
+def on_resize(signum, frame):
+    # only mark the screen stale; the loop repaints in full on its next draw
+    global _SCREEN
+    _SCREEN = None
+
 def main():
+    global _TTY
+    fd=sys.stdin.fileno()
+    _TTY=(fd,termios.tcgetattr(fd))
+    tty.setcbreak(fd)
+    # the cursor only shows at prompts; otherwise it would blink on the parked line
+    sys.stdout.write(_HIDE_CURSOR)
+    old_winch=signal.signal(signal.SIGWINCH,on_resize)
+    try: browse()
+    finally:
+        signal.signal(signal.SIGWINCH,old_winch)
+        sys.stdout.write(_SHOW_CURSOR); sys.stdout.flush()
+        termios.tcsetattr(fd,termios.TCSADRAIN,_TTY[1])
+        _TTY=None
+
+_MOVES = {"up": -1, "k": -1, "down": 1, "j": 1}
+
+def browse():
     devs=fetch_devices()
+    mount_w,header=layout(devs)
     selected=0
     while True:
-        draw_list(devs,selected)
+        draw_list(devs,selected,mount_w,header)
         key=get_key()
+        # a held j/k queues keys faster than frames; apply them all, draw once
+        while key in _MOVES and key_pending():
+            selected=(selected+_MOVES[key])%len(devs)
+            key=get_key()
         if key in ("q","esc"): break
         elif key in ("up","k"): selected=(selected-1)%len(devs)
         elif key in ("down","j"): selected=(selected+1)%len(devs)
-        elif key=="m": do_mount(devs[selected]); time.sleep(0.3); devs=fetch_devices()
-        elif key=="u": do_unmount(devs[selected]); time.sleep(0.3); devs=fetch_devices()
-        elif key=="s": do_swap_toggle(devs[selected]); time.sleep(0.3); devs=fetch_devices()
+        elif key in ACTIONS:
+            ACTIONS[key](devs[selected]); _DF_CACHE.clear()
+            # the next full frame clears the screen and scrollback; let the result be read first
+            sys.stdout.write(_CYN+"Press any key to return..."+_RST); sys.stdout.flush()
+            get_key()
+            devs=fetch_devices(); mount_w,header=layout(devs)
         elif key=="h": show_help()
         elif key=="x":
             mp=devs[selected].mount
-            if mp!="-": run_cmd(["xdg-open",mp],check=False)
+            if mp!="-": run_cmd_silent(["xdg-open",mp])
         elif key=="t":
             mp=devs[selected].mount
-            if mp!="-": run_cmd(["gnome-terminal","--working-directory",mp],check=False)
+            if mp!="-": run_cmd_silent(["gnome-terminal","--working-directory",mp])
         elif key in "123456789":
             idx=int(key)-1
             if idx<len(devs): selected=idx
-        elif key=="enter":
-            devs=fetch_devices()
+        elif key in ("enter","r"):
+            _DF_CACHE.clear(); devs=fetch_devices(); mount_w,header=layout(devs)
         else: pass
-        time.sleep(0.05)
 
 if __name__=="__main__":
     if os.geteuid()!=0:
         os.execvp("sudo",["sudo"]+["python3"]+sys.argv)
+    missing = [name for name in REQUIRED_TOOLS if not BINS[name]]
+    if missing: sys.exit(f"Missing required tools: {', '.join(missing)}")
     try:
         main()
     except KeyboardInterrupt: